@@ -194,8 +194,14 @@ const HotelCard = ({ hotel, expanded, onToggle }) => {
 // Main component
 export default function NorwegianHotelSEOScanner() {
   const [municipalities, setMunicipalities] = useState([]);
+  const [regions, setRegions] = useState([]);
+  const [selectedRegion, setSelectedRegion] = useState('');
   const [selectedMunicipality, setSelectedMunicipality] = useState('');
   const [maxCompanies, setMaxCompanies] = useState(30);
+  const [fanOut, setFanOut] = useState(false);
+  const [maxPerMunicipality, setMaxPerMunicipality] = useState(5);
+  const [maxTotal, setMaxTotal] = useState(200);
+  const [regionStatus, setRegionStatus] = useState({});
   const [isScanning, setIsScanning] = useState(false);
   const [scanProgress, setScanProgress] = useState(0);
   const [scanMessage, setScanMessage] = useState('');
@@ -210,6 +216,7 @@ export default function NorwegianHotelSEOScanner() {
   useEffect(() => {
     checkApiConnection();
     fetchMunicipalities();
+    fetchRegions();
   }, []);
 
   const checkApiConnection = async () => {
@@ -237,13 +244,42 @@ export default function NorwegianHotelSEOScanner() {
     }
   };
 
+  const fetchRegions = async () => {
+    try {
+      const response = await fetch(`${API_BASE}/regions`);
+      if (response.ok) {
+        const data = await response.json();
+        setRegions(data.regions);
+      }
+    } catch (e) {
+      console.error('Failed to fetch regions:', e);
+    }
+  };
+
+  const municipalityName = (code) => (municipalities.find(m => m.code === code) || {}).name || code;
+
+  const failedMunicipalities = Object.values(regionStatus).flatMap(r => r.failed || []);
+
   const startScan = async () => {
     if (isScanning) return;
     
+    // Fan-out scans can be large, so make the upper bound explicit before starting
+    if (fanOut) {
+      const region = regions.find(r => r.code === selectedRegion);
+      const partitionCount = region ? region.municipality_count : municipalities.length;
+      const upperBound = Math.min(partitionCount * maxPerMunicipality, maxTotal);
+      const confirmed = window.confirm(
+        `Fan out over ${partitionCount} municipalities in ${region ? region.name : 'all of Norway'}?\n` +
+        `Up to ${upperBound} companies will be analyzed (${maxPerMunicipality} per municipality, ${maxTotal} total).`
+      );
+      if (!confirmed) return;
+    }
+    
     setIsScanning(true);
     setScanProgress(0);
     setScanMessage('Starting scan...');
     setResults([]);
+    setRegionStatus({});
     setError(null);
     
     try {
@@ -251,7 +287,12 @@ export default function NorwegianHotelSEOScanner() {
       const startResponse = await fetch(`${API_BASE}/scan/start`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
+        body: JSON.stringify(fanOut ? {
+          mode: 'fanout',
+          region: selectedRegion || null,
+          max_per_municipality: maxPerMunicipality,
+          max_companies: maxTotal
+        } : {
           municipality_code: selectedMunicipality || null,
           max_companies: maxCompanies
         })
@@ -260,6 +301,13 @@ export default function NorwegianHotelSEOScanner() {
       if (!startResponse.ok) throw new Error('Failed to start scan');
       
       const { scan_id } = await startResponse.json();
+      let lastResultCount = 0;
+      
+      const fetchResults = async () => {
+        const resultsResponse = await fetch(`${API_BASE}/scan/${scan_id}/results`);
+        const resultsData = await resultsResponse.json();
+        setResults(resultsData.results);
+      };
       
       // Poll for status
       const pollStatus = async () => {
@@ -269,17 +317,21 @@ export default function NorwegianHotelSEOScanner() {
           
           setScanProgress(status.progress);
           setScanMessage(status.message);
+          setRegionStatus(status.regions || {});
           
           if (status.status === 'complete') {
             // Fetch results
-            const resultsResponse = await fetch(`${API_BASE}/scan/${scan_id}/results`);
-            const resultsData = await resultsResponse.json();
-            setResults(resultsData.results);
+            await fetchResults();
             setIsScanning(false);
           } else if (status.status === 'error') {
             setError(status.message);
             setIsScanning(false);
           } else {
+            // Fan-out scans stream partial results as municipalities complete
+            if (status.result_count > lastResultCount) {
+              lastResultCount = status.result_count;
+              await fetchResults();
+            }
             // Continue polling
             setTimeout(pollStatus, 1000);
           }
@@ -385,31 +437,74 @@ export default function NorwegianHotelSEOScanner() {
         {/* Scanner Controls */}
         <div className="bg-slate-900/50 backdrop-blur-xl border border-slate-800 rounded-3xl p-6 mb-8">
           <div className="flex flex-col lg:flex-row gap-4 items-stretch lg:items-end">
-            <div className="flex-1">
-              <label className="block text-sm text-slate-400 mb-2">Municipality (optional)</label>
-              <select
-                value={selectedMunicipality}
-                onChange={(e) => setSelectedMunicipality(e.target.value)}
-                className="w-full px-4 py-3 bg-slate-800 border border-slate-700 rounded-xl text-white focus:outline-none focus:border-pink-300 transition-colors"
-              >
-                <option value="">All of Norway</option>
-                {municipalities.map(m => (
-                  <option key={m.code} value={m.code}>{m.name} ({m.region})</option>
-                ))}
-              </select>
-            </div>
+            {fanOut ? (
+              <div className="flex-1">
+                <label className="block text-sm text-slate-400 mb-2">Region (optional)</label>
+                <select
+                  value={selectedRegion}
+                  onChange={(e) => setSelectedRegion(e.target.value)}
+                  className="w-full px-4 py-3 bg-slate-800 border border-slate-700 rounded-xl text-white focus:outline-none focus:border-pink-300 transition-colors"
+                >
+                  <option value="">All of Norway</option>
+                  {regions.map(r => (
+                    <option key={r.code} value={r.code}>{r.name} ({r.municipality_count} municipalities)</option>
+                  ))}
+                </select>
+              </div>
+            ) : (
+              <div className="flex-1">
+                <label className="block text-sm text-slate-400 mb-2">Municipality (optional)</label>
+                <select
+                  value={selectedMunicipality}
+                  onChange={(e) => setSelectedMunicipality(e.target.value)}
+                  className="w-full px-4 py-3 bg-slate-800 border border-slate-700 rounded-xl text-white focus:outline-none focus:border-pink-300 transition-colors"
+                >
+                  <option value="">All of Norway (single query, max 500)</option>
+                  {municipalities.map(m => (
+                    <option key={m.code} value={m.code}>{m.name} ({m.region})</option>
+                  ))}
+                </select>
+              </div>
+            )}
             
-            <div className="w-40">
-              <label className="block text-sm text-slate-400 mb-2">Max Companies</label>
-              <input
-                type="number"
-                min="10"
-                max="100"
-                value={maxCompanies}
-                onChange={(e) => setMaxCompanies(Number(e.target.value))}
-                className="w-full px-4 py-3 bg-slate-800 border border-slate-700 rounded-xl text-white focus:outline-none focus:border-pink-300"
-              />
-            </div>
+            {fanOut ? (
+              <>
+                <div className="w-40">
+                  <label className="block text-sm text-slate-400 mb-2">Max per Municipality</label>
+                  <input
+                    type="number"
+                    min="1"
+                    max="100"
+                    value={maxPerMunicipality}
+                    onChange={(e) => setMaxPerMunicipality(Number(e.target.value))}
+                    className="w-full px-4 py-3 bg-slate-800 border border-slate-700 rounded-xl text-white focus:outline-none focus:border-pink-300"
+                  />
+                </div>
+                <div className="w-40">
+                  <label className="block text-sm text-slate-400 mb-2">Max Total</label>
+                  <input
+                    type="number"
+                    min="10"
+                    max="2000"
+                    value={maxTotal}
+                    onChange={(e) => setMaxTotal(Number(e.target.value))}
+                    className="w-full px-4 py-3 bg-slate-800 border border-slate-700 rounded-xl text-white focus:outline-none focus:border-pink-300"
+                  />
+                </div>
+              </>
+            ) : (
+              <div className="w-40">
+                <label className="block text-sm text-slate-400 mb-2">Max Companies</label>
+                <input
+                  type="number"
+                  min="10"
+                  max="100"
+                  value={maxCompanies}
+                  onChange={(e) => setMaxCompanies(Number(e.target.value))}
+                  className="w-full px-4 py-3 bg-slate-800 border border-slate-700 rounded-xl text-white focus:outline-none focus:border-pink-300"
+                />
+              </div>
+            )}
             
             <button
               onClick={startScan}
@@ -431,6 +526,17 @@ export default function NorwegianHotelSEOScanner() {
             </button>
           </div>
           
+          <label className="flex items-center gap-2 mt-4 text-sm text-slate-400 cursor-pointer w-fit">
+            <input
+              type="checkbox"
+              checked={fanOut}
+              disabled={isScanning}
+              onChange={(e) => setFanOut(e.target.checked)}
+              className="accent-pink-300"
+            />
+            Fan out: scan every municipality in the region (or all of Norway) in parallel
+          </label>
+          
           {/* Progress Bar */}
           {isScanning && (
             <div className="mt-6">
@@ -444,6 +550,43 @@ export default function NorwegianHotelSEOScanner() {
                   style={{ width: `${scanProgress}%` }}
                 />
               </div>
+              
+              {/* Per-region progress (fan-out scans) */}
+              {Object.keys(regionStatus).length > 0 && (
+                <div className="grid grid-cols-2 md:grid-cols-3 lg:grid-cols-5 gap-3 mt-4">
+                  {Object.entries(regionStatus).map(([name, r]) => (
+                    <div key={name} className="bg-slate-800/50 rounded-xl p-3">
+                      <div className="flex justify-between text-xs text-slate-400 mb-1">
+                        <span className="text-white truncate">{name}</span>
+                        {r.status === 'complete' && <CheckCircle className="w-4 h-4 text-emerald-400 shrink-0" />}
+                      </div>
+                      <div className="h-1 bg-slate-800 rounded-full overflow-hidden mb-1">
+                        <div
+                          className="h-full bg-pink-300 transition-all duration-500"
+                          style={{ width: `${r.total ? Math.round(r.completed / r.total * 100) : 0}%` }}
+                        />
+                      </div>
+                      <p className="text-xs text-slate-500">
+                        {r.completed}/{r.total} municipalities · {r.result_count} companies
+                        {r.failed && r.failed.length > 0 && <span className="text-amber-400"> · {r.failed.length} failed</span>}
+                      </p>
+                    </div>
+                  ))}
+                </div>
+              )}
+            </div>
+          )}
+          
+          {/* Failed municipalities (fan-out scans) */}
+          {!isScanning && failedMunicipalities.length > 0 && (
+            <div className="mt-6 bg-amber-500/10 border border-amber-500/20 rounded-xl p-4 text-amber-400">
+              <p className="font-semibold flex items-center gap-2">
+                <AlertTriangle className="w-4 h-4" />
+                {failedMunicipalities.length} municipalities could not be fetched and are missing from the results
+              </p>
+              <p className="text-sm mt-1">
+                {failedMunicipalities.map(f => `${municipalityName(f.code)} (${f.code})`).join(', ')}
+              </p>
             </div>
           )}
         </div>
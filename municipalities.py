@@ -0,0 +1,101 @@
+"""
+Norwegian municipality index
+Bundled, versioned lookup of all current municipalities and counties (regions).
+"""
+
+import json
+import os
+import unicodedata
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'municipalities.json')
+
+
+def _normalize(text):
+    """Normalize a name for case-insensitive lookups."""
+    return unicodedata.normalize('NFC', text or '').strip().casefold()
+
+
+class MunicipalityIndex:
+    def __init__(self, data):
+        self.version = data.get('version')
+        self.valid_from = data.get('valid_from')
+        self.source = data.get('source')
+
+        self.counties = [dict(c) for c in data.get('counties', [])]
+        self._counties_by_code = {c['code']: c for c in self.counties}
+        self._counties_by_name = {_normalize(c['name']): c for c in self.counties}
+
+        self.municipalities = []
+        self._by_code = {}
+        self._by_name = {}
+        self._by_county = {c['code']: [] for c in self.counties}
+
+        for entry in data.get('municipalities', []):
+            county = self._counties_by_code.get(entry['code'][:2])
+            if not county:
+                raise ValueError(f"Municipality {entry['code']} has no matching county")
+            if entry['code'] in self._by_code:
+                raise ValueError(f"Duplicate municipality code {entry['code']}")
+
+            municipality = {
+                'code': entry['code'],
+                'name': entry['name'],
+                'region': county['name'],
+                'county_code': county['code'],
+            }
+            self.municipalities.append(municipality)
+            self._by_code[municipality['code']] = municipality
+            self._by_name.setdefault(_normalize(municipality['name']), []).append(municipality)
+            self._by_county[county['code']].append(municipality)
+
+    @classmethod
+    def load(cls, path=None):
+        """Load the index from a JSON file (defaults to the bundled data)."""
+        with open(path or DATA_FILE, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.municipalities)
+
+    def __iter__(self):
+        return iter(self.municipalities)
+
+    def get(self, code):
+        """Return the municipality with the given 4-digit code, or None."""
+        return self._by_code.get(str(code).strip().zfill(4)) if code else None
+
+    def find_by_name(self, name):
+        """
+        Return all municipalities with the given name.
+        Names are not unique nationwide (e.g. Herøy, Våler), so this returns a list.
+        """
+        return list(self._by_name.get(_normalize(name), []))
+
+    def get_county(self, region):
+        """Return the county matching a county code or name, or None."""
+        if not region:
+            return None
+        region = str(region).strip()
+        return self._counties_by_code.get(region.zfill(2)) or self._counties_by_name.get(_normalize(region))
+
+    def in_region(self, region):
+        """Return all municipalities in a county, looked up by code or name."""
+        county = self.get_county(region)
+        if not county:
+            return []
+        return list(self._by_county[county['code']])
+
+    def resolve(self, query):
+        """
+        Resolve a code or name to a single municipality.
+        Returns None if nothing matches; raises ValueError if a name is ambiguous.
+        """
+        municipality = self.get(query) if str(query).strip().isdigit() else None
+        if municipality:
+            return municipality
+
+        matches = self.find_by_name(query)
+        if len(matches) > 1:
+            options = ', '.join(f"{m['code']} ({m['region']})" for m in matches)
+            raise ValueError(f"Ambiguous municipality name '{query}': {options}")
+        return matches[0] if matches else None
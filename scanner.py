@@ -12,13 +12,20 @@ from datetime import datetime
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from municipalities import MunicipalityIndex
+import threading
 import warnings
 warnings.filterwarnings('ignore')
 
 class NorwegianHotelScanner:
-    def __init__(self):
+    def __init__(self, municipality_index=None):
         self.brreg_base_url = "https://data.brreg.no/enhetsregisteret/api"
         self.results = []
+        self.municipalities = municipality_index if municipality_index is not None else MunicipalityIndex.load()
+        # Shared across worker threads so fan-out scans stay within a polite request rate
+        self.brreg_min_interval = 0.2
+        self._brreg_lock = threading.Lock()
+        self._brreg_next_request = 0.0
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -26,27 +33,34 @@ class NorwegianHotelScanner:
             'Accept-Language': 'en-US,en;q=0.5',
         })
     
-    def get_municipalities(self):
-        """Return list of major Norwegian municipalities with their codes."""
+    def get_municipalities(self, region=None):
+        """Return list of Norwegian municipalities with their codes, optionally limited to one region."""
+        municipalities = self.municipalities.in_region(region) if region else self.municipalities
+        return [dict(m) for m in municipalities]
+    
+    def get_regions(self):
+        """Return list of Norwegian counties (regions) with their municipality counts."""
         return [
-            {'code': '0301', 'name': 'Oslo', 'region': 'Oslo'},
-            {'code': '4601', 'name': 'Bergen', 'region': 'Vestland'},
-            {'code': '5001', 'name': 'Trondheim', 'region': 'Trøndelag'},
-            {'code': '1103', 'name': 'Stavanger', 'region': 'Rogaland'},
-            {'code': '3005', 'name': 'Drammen', 'region': 'Viken'},
-            {'code': '1201', 'name': 'Bergen', 'region': 'Vestland'},
-            {'code': '1902', 'name': 'Tromsø', 'region': 'Troms og Finnmark'},
-            {'code': '1001', 'name': 'Kristiansand', 'region': 'Agder'},
-            {'code': '3024', 'name': 'Bærum', 'region': 'Viken'},
-            {'code': '4204', 'name': 'Stord', 'region': 'Vestland'},
+            {**county, 'municipality_count': len(self.municipalities.in_region(county['code']))}
+            for county in self.municipalities.counties
         ]
     
-    def fetch_companies_from_brreg(self, municipality_code=None, industry_code='55'):
+    def fetch_companies_from_brreg(self, municipality_code=None, industry_code='55', max_pages=10, verbose=True,
+                                   raise_errors=False, retries=0):
         """
         Fetch real companies from Brønnøysundregistrene API.
         Industry code 55 = Accommodation (hotels, camping, etc.)
+        
+        Args:
+            municipality_code: Optional municipality code to filter by
+            industry_code: NACE industry code prefix
+            max_pages: Maximum number of pages to fetch (None for no limit)
+            verbose: Whether to print progress
+            raise_errors: Re-raise request errors instead of returning the pages fetched so far
+            retries: Number of times to retry a page on rate limiting, server errors or timeouts
         """
-        print(f"\n🔍 Fetching companies from Brønnøysundregistrene...")
+        if verbose:
+            print(f"\n🔍 Fetching companies from Brønnøysundregistrene...")
         
         companies = []
         page = 0
@@ -64,13 +78,7 @@ class NorwegianHotelScanner:
                 params['kommunenummer'] = municipality_code
             
             try:
-                response = self.session.get(
-                    f"{self.brreg_base_url}/enheter",
-                    params=params,
-                    timeout=30
-                )
-                response.raise_for_status()
-                data = response.json()
+                data = self._get_brreg_page(params, retries)
                 
                 embedded = data.get('_embedded', {})
                 enheter = embedded.get('enheter', [])
@@ -95,25 +103,73 @@ class NorwegianHotelScanner:
                     }
                     companies.append(company_data)
                 
-                print(f"   Retrieved page {page + 1}: {len(enheter)} companies (total: {len(companies)})")
+                if verbose:
+                    print(f"   Retrieved page {page + 1}: {len(enheter)} companies (total: {len(companies)})")
                 
                 # Check if there are more pages
                 page_info = data.get('page', {})
                 total_pages = page_info.get('totalPages', 1)
                 
-                if page >= total_pages - 1 or page >= 9:  # Limit to 10 pages (500 companies max)
+                if page >= total_pages - 1:
+                    break
+                if max_pages is not None and page >= max_pages - 1:  # Default 10 pages (500 companies max)
                     break
                 
                 page += 1
                 time.sleep(0.5)  # Rate limiting - be nice to the API
                 
             except requests.exceptions.RequestException as e:
+                if raise_errors:
+                    raise
                 print(f"   ❌ Error fetching from Brønnøysund: {e}")
                 break
         
-        print(f"✅ Found {len(companies)} accommodation businesses")
+        if verbose:
+            print(f"✅ Found {len(companies)} accommodation businesses")
         return companies
     
+    def _wait_for_brreg(self):
+        """Block until the shared rate limiter allows the next registry request."""
+        with self._brreg_lock:
+            wait = self._brreg_next_request - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._brreg_next_request = time.monotonic() + self.brreg_min_interval
+    
+    def _get_brreg_page(self, params, retries=0):
+        """
+        Fetch one page from the registry, retrying 429s, 5xx errors and timeouts.
+        Backs off exponentially, or for as long as the Retry-After header asks.
+        """
+        attempt = 0
+        while True:
+            self._wait_for_brreg()
+            try:
+                response = self.session.get(
+                    f"{self.brreg_base_url}/enheter",
+                    params=params,
+                    timeout=30
+                )
+                response.raise_for_status()
+                return response.json()
+            except (requests.exceptions.HTTPError, requests.exceptions.Timeout,
+                    requests.exceptions.ConnectionError) as e:
+                response = e.response
+                status = response.status_code if response is not None else None
+                retryable = status is None or status == 429 or status >= 500
+                if not retryable or attempt >= retries:
+                    raise
+                
+                delay = min(2 ** attempt, 30)
+                retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+                if retry_after.strip().isdigit():
+                    delay = min(int(retry_after), 120)
+                
+                # Push back every worker, not just this one, when the registry asks us to slow down
+                with self._brreg_lock:
+                    self._brreg_next_request = max(self._brreg_next_request, time.monotonic() + delay)
+                attempt += 1
+    
     def find_website(self, company):
         """Try to find company website if not in registry."""
         if company.get('website'):
@@ -379,6 +435,163 @@ class NorwegianHotelScanner:
         print(f"\n✅ Analysis complete! {len(self.results)} companies analyzed.")
         return self.results
     
+    def iter_partitioned_scan(self, region=None, max_companies=None, max_per_municipality=None, max_workers=4,
+                              retries=3):
+        """
+        Fan-out scan partitioned by municipality, streaming events as partitions finish.
+        
+        Each municipality is fetched from Brønnøysund with its own query, so coverage
+        is not truncated by the page limit of a single nationwide query.
+        
+        Args:
+            region: Optional county code or name to limit the scan to
+            max_companies: Optional total number of companies to analyze across all partitions
+            max_per_municipality: Optional number of companies to analyze per municipality
+            max_workers: Number of municipalities scanned concurrently
+            retries: Number of retries per registry page before a municipality is reported as failed
+        
+        Yields:
+            {'type': 'partition', ...} when a municipality is done, with its results and overall progress
+            {'type': 'region', ...} when every municipality in a region is done, with the region's results
+        """
+        if max_companies is not None and max_companies < 0:
+            raise ValueError("max_companies must not be negative")
+        if max_per_municipality is not None and max_per_municipality < 0:
+            raise ValueError("max_per_municipality must not be negative")
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        
+        if region:
+            partitions = self.municipalities.in_region(region)
+            if not partitions:
+                raise ValueError(f"Unknown region: {region}")
+        else:
+            partitions = list(self.municipalities)
+        
+        regions = {}
+        for m in partitions:
+            regions.setdefault(m['region'], {'remaining': 0, 'results': []})['remaining'] += 1
+        
+        budget_lock = threading.Lock()
+        budget = {'remaining': max_companies}
+        
+        def claim(count):
+            """Reserve up to `count` companies from the shared analysis budget."""
+            if max_companies is None:
+                return count
+            with budget_lock:
+                granted = min(count, budget['remaining'])
+                budget['remaining'] -= granted
+                return granted
+        
+        def scan_partition(municipality):
+            if max_companies is not None and budget['remaining'] <= 0:
+                return []
+            
+            companies = [
+                {**c, 'municipality_code': municipality['code'], 'region': municipality['region']}
+                for c in self.fetch_companies_from_brreg(
+                    municipality['code'], max_pages=None, verbose=False, raise_errors=True, retries=retries
+                )
+            ]
+            if max_per_municipality is not None:
+                companies = companies[:max_per_municipality]
+            companies = companies[:claim(len(companies))]
+            
+            results = []
+            for company in companies:
+                try:
+                    results.append(self.analyze_company(company))
+                except Exception as e:
+                    print(f"   ❌ Error analyzing {company.get('name')}: {e}")
+            return results
+        
+        seen = set()
+        completed = 0
+        completed_regions = 0
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {executor.submit(scan_partition, m): m for m in partitions}
+            for future in as_completed(futures):
+                municipality = futures[future]
+                error = None
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = []
+                    error = str(e)
+                
+                # Companies are keyed on business address, but guard against overlap anyway
+                results = [r for r in results if r.get('org_number') not in seen]
+                seen.update(r.get('org_number') for r in results)
+                
+                completed += 1
+                region_state = regions[municipality['region']]
+                region_state['results'].extend(results)
+                region_state['remaining'] -= 1
+                
+                yield {
+                    'type': 'partition',
+                    'municipality': municipality,
+                    'region': municipality['region'],
+                    'results': results,
+                    'error': error,
+                    'completed': completed,
+                    'total': len(partitions),
+                }
+                
+                if region_state['remaining'] == 0:
+                    completed_regions += 1
+                    region_results = sorted(region_state['results'], key=lambda x: x['opportunity_score'], reverse=True)
+                    yield {
+                        'type': 'region',
+                        'region': municipality['region'],
+                        'county_code': municipality['county_code'],
+                        'results': region_results,
+                        'completed': completed_regions,
+                        'total': len(regions),
+                    }
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def scan_partitioned(self, region=None, max_companies=None, max_per_municipality=None, max_workers=4):
+        """
+        Fan-out scanning function: scans every municipality (optionally within one region) concurrently.
+        
+        Args:
+            region: Optional county code or name to limit the scan to
+            max_companies: Optional total number of companies to analyze
+            max_per_municipality: Optional number of companies to analyze per municipality
+            max_workers: Number of municipalities scanned concurrently
+        """
+        print("\n" + "="*60)
+        print("🏨 NORWEGIAN HOTEL SEO SCANNER (FAN-OUT)")
+        print("="*60)
+        
+        self.results = []
+        failed = []
+        
+        for event in self.iter_partitioned_scan(region, max_companies, max_per_municipality, max_workers):
+            if event['type'] == 'partition':
+                municipality = event['municipality']
+                status = f"❌ {event['error']}" if event['error'] else f"{len(event['results'])} companies"
+                print(f"   [{event['completed']}/{event['total']}] {municipality['name']} ({municipality['region']}): {status}")
+                if event['error']:
+                    failed.append(municipality)
+                self.results.extend(event['results'])
+            elif event['type'] == 'region':
+                print(f"✅ Region complete: {event['region']} ({len(event['results'])} companies, "
+                      f"{event['completed']}/{event['total']} regions)")
+        
+        self.results.sort(key=lambda x: x['opportunity_score'], reverse=True)
+        
+        print(f"\n✅ Analysis complete! {len(self.results)} companies analyzed.")
+        if failed:
+            print(f"⚠️  {len(failed)} municipalities failed and are missing from the results: "
+                  f"{', '.join(m['code'] for m in failed)}")
+        return self.results
+    
     def export_csv(self, filename=None):
         """Export results to CSV file."""
         if not filename:
@@ -390,7 +603,7 @@ class NorwegianHotelScanner:
             return
         
         fieldnames = [
-            'name', 'org_number', 'municipality', 'address', 'postal_code', 'postal_place',
+            'name', 'org_number', 'municipality', 'region', 'address', 'postal_code', 'postal_place',
             'employees', 'website', 'seo_score', 'opportunity_score', 'seo_issues',
             'industry', 'registered_date'
         ]
@@ -459,37 +672,72 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Norwegian Hotel SEO Scanner')
-    parser.add_argument('--municipality', '-m', help='Municipality code (e.g., 0301 for Oslo)')
-    parser.add_argument('--max', '-n', type=int, default=30, help='Maximum companies to analyze')
+    parser.add_argument('--municipality', '-m', help='Municipality code or name (e.g., 0301 or Oslo)')
+    parser.add_argument('--region', '-r', help='County code or name to fan out over (e.g., 46 or Vestland)')
+    parser.add_argument('--fan-out', '-F', action='store_true', help='Scan every municipality as its own partition, concurrently')
+    parser.add_argument('--workers', '-w', type=int, default=4, help='Municipalities scanned concurrently in fan-out mode')
+    parser.add_argument('--max', '-n', type=int, help='Maximum companies to analyze (default 30, unlimited in fan-out mode)')
     parser.add_argument('--output', '-o', help='Output filename (without extension)')
     parser.add_argument('--format', '-f', choices=['csv', 'json', 'both'], default='both', help='Output format')
     parser.add_argument('--sequential', '-s', action='store_true', help='Sequential mode (slower but gentler)')
     
     args = parser.parse_args()
     
+    if args.max is not None and args.max < 0:
+        parser.error("--max must not be negative")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    
     scanner = NorwegianHotelScanner()
+    index = scanner.municipalities
+    
+    municipality = None
+    if args.municipality:
+        try:
+            municipality = index.resolve(args.municipality)
+        except ValueError as e:
+            parser.error(str(e))
+        if not municipality:
+            parser.error(f"Unknown municipality '{args.municipality}' (index version {index.version})")
+    
+    region = None
+    if args.region:
+        region = index.get_county(args.region)
+        if not region:
+            parser.error(f"Unknown region '{args.region}' (index version {index.version})")
+    
+    fan_out = (args.fan_out or region is not None) and municipality is None
     
-    # Show available municipalities
-    if not args.municipality:
-        print("\nAvailable municipalities:")
-        for m in scanner.get_municipalities():
-            print(f"  {m['code']}: {m['name']} ({m['region']})")
-        print("\nUse --municipality CODE or -m CODE to filter by municipality")
-        print("Or run without filter to scan all of Norway\n")
+    # Show available regions
+    if not municipality and not fan_out:
+        print(f"\nAvailable regions (municipality index {index.version}, {len(index)} municipalities):")
+        for r in scanner.get_regions():
+            print(f"  {r['code']}: {r['name']} ({r['municipality_count']} municipalities)")
+        print("\nUse --municipality CODE|NAME or -m CODE|NAME to filter by municipality")
+        print("Use --region CODE|NAME or --fan-out to scan every municipality in parallel")
+        print("Or run without filter to scan all of Norway (single query, max 500 companies)\n")
     
     # Run the scan
-    results = scanner.scan(
-        municipality_code=args.municipality,
-        max_companies=args.max,
-        parallel=not args.sequential
-    )
+    if fan_out:
+        results = scanner.scan_partitioned(
+            region=region['code'] if region else None,
+            max_companies=args.max,
+            max_workers=1 if args.sequential else args.workers
+        )
+    else:
+        results = scanner.scan(
+            municipality_code=municipality['code'] if municipality else None,
+            max_companies=30 if args.max is None else args.max,
+            parallel=not args.sequential
+        )
     
     if results:
         # Print summary
         scanner.print_summary()
         
         # Export results
-        base_filename = args.output or f"hotel_scan_{args.municipality or 'norway'}"
+        scope = municipality['code'] if municipality else (region['code'] if region else 'norway')
+        base_filename = args.output or f"hotel_scan_{scope}"
         
         if args.format in ['csv', 'both']:
             scanner.export_csv(f"{base_filename}.csv")
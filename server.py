@@ -16,11 +16,27 @@ CORS(app)  # Enable CORS for frontend
 scans = {}
 scanner = NorwegianHotelScanner()
 
+# Upper bound on concurrent municipalities per fan-out scan
+MAX_FANOUT_WORKERS = 8
+
 
 @app.route('/api/municipalities', methods=['GET'])
 def get_municipalities():
-    """Return list of available municipalities."""
-    return jsonify(scanner.get_municipalities())
+    """Return list of available municipalities, optionally filtered by ?region=."""
+    region = request.args.get('region')
+    if region and not scanner.municipalities.get_county(region):
+        return jsonify({'error': 'Region not found'}), 404
+    return jsonify(scanner.get_municipalities(region))
+
+
+@app.route('/api/regions', methods=['GET'])
+def get_regions():
+    """Return list of regions (counties) and the municipality index version."""
+    return jsonify({
+        'version': scanner.municipalities.version,
+        'valid_from': scanner.municipalities.valid_from,
+        'regions': scanner.get_regions()
+    })
 
 
 @app.route('/api/scan/start', methods=['POST'])
@@ -28,14 +44,36 @@ def start_scan():
     """Start a new scan."""
     data = request.json or {}
     municipality_code = data.get('municipality_code')
-    max_companies = data.get('max_companies', 30)
+    region = data.get('region')
+    # A single municipality wins over a region, as on the command line
+    fan_out = (data.get('mode') == 'fanout' or bool(region)) and not municipality_code
+    max_companies = data.get('max_companies', None if fan_out else 30)
+    
+    if fan_out and region and not scanner.municipalities.get_county(region):
+        return jsonify({'error': 'Region not found'}), 400
+    
+    try:
+        max_companies = None if max_companies is None else int(max_companies)
+        max_per_municipality = data.get('max_per_municipality')
+        max_per_municipality = None if max_per_municipality is None else int(max_per_municipality)
+        max_workers = int(data.get('max_workers', 4))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'max_companies, max_per_municipality and max_workers must be integers'}), 400
+    
+    if any(v is not None and v < 0 for v in (max_companies, max_per_municipality)):
+        return jsonify({'error': 'max_companies and max_per_municipality must not be negative'}), 400
+    if max_workers < 1:
+        return jsonify({'error': 'max_workers must be at least 1'}), 400
+    max_workers = min(max_workers, MAX_FANOUT_WORKERS)
     
     scan_id = str(uuid.uuid4())
     scans[scan_id] = {
         'status': 'running',
+        'mode': 'fanout' if fan_out else 'single',
         'progress': 0,
         'message': 'Starting scan...',
-        'results': []
+        'results': [],
+        'regions': {}
     }
     
     def run_scan():
@@ -74,7 +112,46 @@ def start_scan():
             scans[scan_id]['status'] = 'error'
             scans[scan_id]['message'] = str(e)
     
-    thread = threading.Thread(target=run_scan)
+    def run_fanout_scan():
+        try:
+            scan = scans[scan_id]
+            for m in scanner.get_municipalities(region):
+                scan['regions'].setdefault(m['region'], {'status': 'running', 'completed': 0, 'total': 0, 'result_count': 0, 'failed': []})
+                scan['regions'][m['region']]['total'] += 1
+            
+            events = scanner.iter_partitioned_scan(
+                region=region,
+                max_companies=max_companies,
+                max_per_municipality=max_per_municipality,
+                max_workers=max_workers
+            )
+            
+            for event in events:
+                region_state = scan['regions'][event['region']]
+                if event['type'] == 'partition':
+                    # Stream partition results as they arrive
+                    scan['results'].extend(event['results'])
+                    region_state['completed'] += 1
+                    region_state['result_count'] += len(event['results'])
+                    if event['error']:
+                        region_state['failed'].append({'code': event['municipality']['code'], 'error': event['error']})
+                    scan['progress'] = int(event['completed'] / event['total'] * 100)
+                    scan['message'] = (f"Scanned {event['completed']}/{event['total']} municipalities: "
+                                       f"{event['municipality']['name']} ({event['region']})")
+                elif event['type'] == 'region':
+                    region_state['status'] = 'complete'
+            
+            # Assign a sorted copy; sorting in place would briefly empty the list for concurrent readers
+            scan['results'] = sorted(scan['results'], key=lambda x: x.get('opportunity_score', 0), reverse=True)
+            scan['status'] = 'complete'
+            scan['progress'] = 100
+            scan['message'] = 'Scan complete!'
+            
+        except Exception as e:
+            scans[scan_id]['status'] = 'error'
+            scans[scan_id]['message'] = str(e)
+    
+    thread = threading.Thread(target=run_fanout_scan if fan_out else run_scan)
     thread.start()
     
     return jsonify({'scan_id': scan_id})
@@ -91,26 +168,35 @@ def get_scan_status(scan_id):
         'status': scan['status'],
         'progress': scan['progress'],
         'message': scan['message'],
-        'result_count': len(scan.get('results', []))
+        'result_count': len(scan.get('results', [])),
+        'regions': scan.get('regions', {})
     })
 
 
 @app.route('/api/scan/<scan_id>/results', methods=['GET'])
 def get_scan_results(scan_id):
-    """Get the results of a completed scan."""
+    """Get the results of a scan (partial while a fan-out scan is running), optionally filtered by ?region=."""
     if scan_id not in scans:
         return jsonify({'error': 'Scan not found'}), 404
     
     scan = scans[scan_id]
+    region = request.args.get('region')
+    county = scanner.municipalities.get_county(region) if region else None
+    if region and not county:
+        return jsonify({'error': 'Region not found'}), 404
     
     # Clean results for JSON serialization
     results = []
-    for r in scan.get('results', []):
+    for r in list(scan.get('results', [])):
+        if county and r.get('region') != county['name']:
+            continue
+
         clean_result = {
             'id': r.get('org_number'),
             'name': r.get('name'),
             'org_number': r.get('org_number'),
             'municipality': r.get('municipality'),
+            'region': r.get('region'),
             'postal_place': r.get('postal_place'),
             'address': r.get('address'),
             'employees': r.get('employees', 0),